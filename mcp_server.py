@@ -5,22 +5,138 @@ FastAPI 기반 MCP (Model Context Protocol) 서버
 """
 
 import asyncio
-import json
+import errno
+import os
+import stat
 import sys
 import logging
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
+from typing import IO, AsyncContextManager, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Any, Tuple, Union
 from contextlib import asynccontextmanager
 
+import msgspec
+import orjson
 import uvicorn
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
-import aiofiles
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel, ConfigDict, Field
+
+try:
+    import uvloop
+except ImportError:  # Windows 등 uvloop 미지원 환경에서는 기본 asyncio 루프 사용
+    uvloop = None
+
+try:
+    import fcntl
+except ImportError:  # Windows에는 fcntl이 없음 (파이프 크기 조정 생략)
+    fcntl = None
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 큰 파일을 나눠 읽을 때의 청크 크기 (글자 수)
+_READ_CHUNK_SIZE = 256 * 1024
+
+# os.open 바이너리 플래그 (Windows 전용, 다른 플랫폼에서는 0)
+_O_BINARY = getattr(os, "O_BINARY", 0)
+
+# 동기 파일 I/O 헬퍼 (asyncio.to_thread로 한 번에 실행)
+def _read_text(path: Path) -> str:
+    """파일 전체를 UTF-8 텍스트로 읽기"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def _read_text_limited(path: Path, limit: int, chunk_size: int = _READ_CHUNK_SIZE) -> Tuple[str, bool]:
+    """최대 limit 글자까지 청크 단위로 읽고 (내용, 잘림 여부) 반환"""
+    chunks = []
+    remaining = limit
+    with open(path, 'r', encoding='utf-8') as f:
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                return "".join(chunks), False
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        truncated = f.read(1) != ""
+    return "".join(chunks), truncated
+
+def _open_text(path: Path) -> IO[str]:
+    """스트리밍 읽기용으로 파일을 UTF-8 텍스트 모드로 열기"""
+    return open(path, 'r', encoding='utf-8')
+
+def _encode_text(content: str) -> bytes:
+    """텍스트 모드 쓰기와 같은 결과가 되도록 줄바꿈을 os.linesep으로 바꾸고 UTF-8로 인코딩"""
+    if os.linesep != "\n":
+        content = content.replace("\n", os.linesep)
+    return content.encode('utf-8')
+
+def _write_fd(fd: int, data: bytes) -> None:
+    """부분 쓰기가 생겨도 모두 쓸 때까지 os.write 반복"""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+def _write_text(path: Path, content: str) -> None:
+    """파일을 UTF-8 텍스트로 덮어쓰기 (버퍼링된 텍스트 레이어 없이 한 번에 씀)"""
+    # 인코딩할 수 없는 내용이면 파일을 비우기 전에 실패하도록 먼저 인코딩
+    data = _encode_text(content)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | _O_BINARY, 0o666)
+    try:
+        _write_fd(fd, data)
+    finally:
+        os.close(fd)
+
+def _append_text(path: Path, content: str) -> None:
+    """파일 끝에 UTF-8 텍스트 추가"""
+    data = _encode_text(content)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND | _O_BINARY, 0o666)
+    try:
+        _write_fd(fd, data)
+    finally:
+        os.close(fd)
+
+def _scan_dir(path: Path) -> List[Tuple[str, bool, Optional[int], float]]:
+    """디렉토리 항목을 (이름, 디렉토리 여부, 크기, 수정 시각) 튜플 목록으로 반환"""
+    entries = []
+    # scandir 항목은 stat 결과를 재사용하므로 항목당 stat 호출은 한 번
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                st = entry.stat()
+            except OSError:
+                # 권한이 없거나 접근할 수 없는 파일은 건너뛰기
+                continue
+            entries.append((
+                entry.name,
+                stat.S_ISDIR(st.st_mode),
+                st.st_size if stat.S_ISREG(st.st_mode) else None,
+                st.st_mtime
+            ))
+    return entries
+
+def _replace_text(path: Path, find: str, replace: str) -> int:
+    """파일 내용을 찾아 바꾸고 치환 횟수 반환 (변경이 없으면 쓰지 않음)"""
+    if not find:
+        raise ValueError("find must not be empty")
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    
+    # 바뀔 내용이 없으면 치환 문자열을 만들지도, 파일을 다시 쓰지도 않음
+    if find == replace or find not in content:
+        return 0
+    
+    # split + join: 한 번의 스캔으로 치환 횟수와 결과를 함께 얻음
+    parts = content.split(find)
+    replacements = len(parts) - 1
+    _write_text(path, replace.join(parts))
+    return replacements
+
 # MCP 메시지 모델들
 class MCPRequest(BaseModel):
     jsonrpc: str = "2.0"
@@ -34,8 +150,17 @@ class MCPResponse(BaseModel):
     result: Optional[Dict[str, Any]] = None
     error: Optional[Dict[str, Any]] = None
     
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
+
+# stdio 경로 전용 요청 모델 (msgspec이 JSON 파싱과 타입 검사를 한 번에 수행)
+class MCPRequestMsg(msgspec.Struct):
+    method: str
+    jsonrpc: str = "2.0"
+    id: Optional[Union[str, int]] = None
+    params: Optional[Dict[str, Any]] = None
+
+_REQUEST_DECODER = msgspec.json.Decoder(MCPRequestMsg)
+_MSGPACK_REQUEST_DECODER = msgspec.msgpack.Decoder(MCPRequestMsg)
 
 class MCPNotification(BaseModel):
     jsonrpc: str = "2.0"
@@ -79,174 +204,332 @@ class FileSystemItem(BaseModel):
     size: Optional[int] = None
     modified: Optional[str] = None
 
+# 도구 스키마 (요청마다 다시 만들지 않도록 모듈 로드 시 한 번만 생성)
+_TOOLS_SCHEMA = [
+    {
+        "name": "read_file",
+        "description": "파일 내용을 읽어옵니다",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "filepath": {
+                    "type": "string",
+                    "description": "읽을 파일의 경로"
+                },
+                "max_size": {
+                    "type": "integer",
+                    "description": "최대로 읽을 글자 수 (초과하면 앞부분만 반환)"
+                }
+            },
+            "required": ["filepath"]
+        }
+    },
+    {
+        "name": "write_file",
+        "description": "파일에 내용을 씁니다 (덮어쓰기)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "filepath": {
+                    "type": "string",
+                    "description": "쓸 파일의 경로"
+                },
+                "content": {
+                    "type": "string",
+                    "description": "파일 내용"
+                }
+            },
+            "required": ["filepath", "content"]
+        }
+    },
+    {
+        "name": "read_file_stream",
+        "description": "파일 내용을 청크 단위로 스트리밍합니다 (stdio: notifications/file_chunk 알림, HTTP: /mcp/tools/stream)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "filepath": {
+                    "type": "string",
+                    "description": "읽을 파일의 경로"
+                }
+            },
+            "required": ["filepath"]
+        }
+    },
+    {
+        "name": "write_file_stream",
+        "description": "파일 내용을 청크 단위로 씁니다 (seq 0은 덮어쓰기, 이후 seq는 바로 앞 seq 다음 번호만 받아 이어 쓰기)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "filepath": {
+                    "type": "string",
+                    "description": "쓸 파일의 경로"
+                },
+                "chunk": {
+                    "type": "string",
+                    "description": "이번 청크의 내용"
+                },
+                "seq": {
+                    "type": "integer",
+                    "description": "청크 순번 (0부터 시작, 이전 청크의 응답을 받은 뒤 1씩 늘려 전송; 빠지거나 순서가 바뀐 seq는 거부)"
+                }
+            },
+            "required": ["filepath", "chunk", "seq"]
+        }
+    },
+    {
+        "name": "append_file",
+        "description": "파일 끝에 내용을 추가합니다",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "filepath": {
+                    "type": "string",
+                    "description": "추가할 파일의 경로"
+                },
+                "content": {
+                    "type": "string",
+                    "description": "추가할 내용"
+                }
+            },
+            "required": ["filepath", "content"]
+        }
+    },
+    {
+        "name": "update_file",
+        "description": "파일 내용을 찾아 바꿉니다",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "filepath": {
+                    "type": "string",
+                    "description": "수정할 파일의 경로"
+                },
+                "find": {
+                    "type": "string",
+                    "description": "찾을 문자열"
+                },
+                "replace": {
+                    "type": "string",
+                    "description": "바꿀 문자열"
+                }
+            },
+            "required": ["filepath", "find", "replace"]
+        }
+    },
+    {
+        "name": "delete_file",
+        "description": "파일을 삭제합니다",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "filepath": {
+                    "type": "string",
+                    "description": "삭제할 파일의 경로"
+                }
+            },
+            "required": ["filepath"]
+        }
+    },
+    {
+        "name": "list_files",
+        "description": "디렉토리 내용을 조회합니다",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "dirpath": {
+                    "type": "string",
+                    "description": "조회할 디렉토리 경로"
+                }
+            },
+            "required": ["dirpath"]
+        }
+    },
+    {
+        "name": "create_directory",
+        "description": "새 디렉토리를 생성합니다",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "dirpath": {
+                    "type": "string",
+                    "description": "생성할 디렉토리 경로"
+                }
+            },
+            "required": ["dirpath"]
+        }
+    }
+]
+
+_TOOLS_RESULT = {"tools": _TOOLS_SCHEMA}
+
+# initialize 결과 (FastAPI와 stdio 경로가 함께 사용)
+_INITIALIZE_RESULT = {
+    "protocolVersion": "2024-11-05",
+    "capabilities": {
+        "tools": {
+            "listChanged": True
+        }
+    },
+    "serverInfo": {
+        "name": "local-file-crud-mcp",
+        "version": "1.0.0"
+    }
+}
+
+# arguments가 없는 도구 호출에 쓰는 공유 빈 dict (핸들러는 읽기만 하므로 요청마다 새로 만들지 않음)
+_EMPTY_ARGUMENTS: Dict[str, Any] = {}
+
+# 고정 결과는 JSON을 미리 만들어 두고 응답마다 id만 끼워 넣음
+# (_TOOLS_RESULT / _INITIALIZE_RESULT는 읽기 전용: 수정하면 아래 JSON과 달라짐)
+_TOOLS_RESULT_JSON = orjson.dumps(_TOOLS_RESULT)
+_INITIALIZE_RESULT_JSON = orjson.dumps(_INITIALIZE_RESULT)
+
+def _encode_response(response: MCPResponse) -> bytes:
+    """JSON-RPC 응답을 bytes로 직렬화"""
+    head = b'{"jsonrpc":"2.0","id":' + orjson.dumps(response.id)
+    if response.result is not None:
+        if response.result is _TOOLS_RESULT:
+            result_json = _TOOLS_RESULT_JSON
+        elif response.result is _INITIALIZE_RESULT:
+            result_json = _INITIALIZE_RESULT_JSON
+        else:
+            result_json = orjson.dumps(response.result)
+        return head + b',"result":' + result_json + b'}'
+    if response.error is not None:
+        return head + b',"error":' + orjson.dumps(response.error) + b'}'
+    return head + b'}'
+
+def _frame_msgpack(message: Dict[str, Any]) -> bytes:
+    """메시지를 4바이트 길이(big-endian) + MessagePack 프레임으로 직렬화"""
+    body = msgspec.msgpack.encode(message)
+    return len(body).to_bytes(4, "big") + body
+
+def _response_message(response: MCPResponse) -> Dict[str, Any]:
+    """JSON-RPC 응답을 dict로 변환 (값이 없는 result/error는 생략)"""
+    message = {"jsonrpc": "2.0", "id": response.id}
+    if response.result is not None:
+        message["result"] = response.result
+    elif response.error is not None:
+        message["error"] = response.error
+    return message
+
+def _encode_msgpack_frame(response: MCPResponse) -> bytes:
+    """JSON-RPC 응답을 MessagePack 프레임으로 직렬화"""
+    return _frame_msgpack(_response_message(response))
+
+def _json_response(response: MCPResponse) -> Response:
+    """MCPResponse를 재검증/재직렬화 없이 HTTP JSON 응답으로 변환"""
+    return Response(content=_encode_response(response), media_type="application/json")
+
+# 없는 경로 캐시: 같은 경로를 짧은 시간 안에 반복 조회할 때 syscall 생략
+_NEGATIVE_CACHE_TTL = 1.0
+_NEGATIVE_CACHE_SIZE = 4096
+
+# read_file 내용 캐시: 같은 파일을 반복해서 읽을 때 I/O와 디코딩 생략
+_CONTENT_CACHE_SIZE = 128
+_CONTENT_CACHE_MAX_FILE_SIZE = 1024 * 1024
+
+# 스트리밍 도구의 청크 크기 (글자 수)
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+# write_file_stream이 다음 seq를 기억하는 경로 수 (오래된 것부터 제거)
+_STREAM_WRITE_STATE_SIZE = 4096
+
+# 스트리밍 도구가 청크마다 호출하는 알림 콜백 ({"seq", "chunk", "eof"}를 받음)
+_Notify = Callable[[Dict[str, Any]], Awaitable[None]]
+
+async def _iter_chunks(f: IO[str], chunk_size: int = _STREAM_CHUNK_SIZE) -> AsyncIterator[str]:
+    """열린 파일을 청크 단위로 읽어 반환하고 끝나면 파일을 닫음"""
+    try:
+        while True:
+            chunk = await asyncio.to_thread(f.read, chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        f.close()
+
+async def _iter_encoded_chunks(lock: AsyncContextManager[None],
+                               opener: Callable[[], Awaitable[Tuple[IO[str], str]]]) -> AsyncIterator[bytes]:
+    """HTTP 스트리밍 응답용 UTF-8 청크 (잠금을 잡고 파일을 연 뒤, 제너레이터가 끝나거나 닫히면 파일을 닫고 잠금 해제)"""
+    async with lock:
+        f, _ = await opener()
+        try:
+            # 파일을 연 직후 빈 바이트를 한 번 내보냄: 호출하는 쪽은 이것을 먼저 꺼내 열기 오류를 확인
+            yield b""
+            async for chunk in _iter_chunks(f):
+                yield chunk.encode('utf-8')
+        finally:
+            f.close()
+
 # MCP 서버 클래스
 class MCPServer:
     def __init__(self):
         self.app = FastAPI(title="Local File CRUD MCP Server", version="1.0.0")
+        # 서버는 작업 디렉토리를 바꾸지 않으므로 시작 시 한 번만 조회
+        self._cwd = os.getcwd()
+        # 정규화된 절대 경로(os.path.normcase) -> 없다고 확인한 시각 (LRU 순서)
+        self._missing_paths: "OrderedDict[str, float]" = OrderedDict()
+        # 정규화된 절대 경로 -> ((mtime_ns, size), 내용) (LRU 순서)
+        self._content_cache: "OrderedDict[str, Tuple[Tuple[int, int], str]]" = OrderedDict()
+        # 정규화된 절대 경로 -> [잠금, 사용 중인 요청 수] (같은 경로 작업은 요청 순서대로 하나씩 실행)
+        self._path_locks: Dict[str, List[Any]] = {}
+        # 정규화된 절대 경로 -> write_file_stream이 다음에 받을 seq (LRU 순서)
+        self._stream_next_seq: "OrderedDict[str, int]" = OrderedDict()
+        # 도구 이름 -> 핸들러 (FastAPI와 stdio 경로가 함께 사용)
+        self._tool_dispatch = {
+            "read_file": lambda args: self.read_file(args.get("filepath"), args.get("max_size")),
+            "write_file": lambda args: self.write_file(args.get("filepath"), args.get("content")),
+            "append_file": lambda args: self.append_file(args.get("filepath"), args.get("content")),
+            "update_file": lambda args: self.update_file(
+                args.get("filepath"), args.get("find"), args.get("replace")
+            ),
+            "delete_file": lambda args: self.delete_file(args.get("filepath")),
+            "list_files": lambda args: self.list_files(args.get("dirpath")),
+            "create_directory": lambda args: self.create_directory(args.get("dirpath")),
+            "write_file_stream": lambda args: self.write_file_stream(
+                args.get("filepath"), args.get("chunk"), args.get("seq")
+            ),
+        }
+        # 청크를 알림으로 보내야 하는 스트리밍 도구 (notify 콜백을 함께 받음)
+        self._stream_tool_dispatch = {
+            "read_file_stream": lambda args, notify: self.read_file_stream(args.get("filepath"), notify),
+        }
         self.setup_routes()
         
     def setup_routes(self):
         """FastAPI 라우트 설정"""
         
-        @self.app.post("/mcp/initialize")
+        @self.app.post("/mcp/initialize", response_model=None)
         async def initialize_mcp(request: MCPRequest):
             """MCP 초기화"""
             try:
-                return MCPResponse(
-                    id=request.id,
-                    result={
-                        "protocolVersion": "2024-11-05",
-                        "capabilities": {
-                            "tools": {
-                                "listChanged": True
-                            }
-                        },
-                        "serverInfo": {
-                            "name": "local-file-crud-mcp",
-                            "version": "1.0.0"
-                        }
-                    }
-                )
+                return _json_response(MCPResponse.model_construct(id=request.id, result=_INITIALIZE_RESULT))
             except Exception as e:
                 logger.error(f"Initialize error: {e}")
-                return MCPResponse(
+                return _json_response(MCPResponse.model_construct(
                     id=request.id,
                     error={"code": -1, "message": str(e)}
-                )
+                ))
 
-        @self.app.post("/mcp/tools/list")
+        @self.app.post("/mcp/tools/list", response_model=None)
         async def list_tools(request: MCPRequest):
             """사용 가능한 도구 목록 반환"""
             try:
-                tools = [
-                    {
-                        "name": "read_file",
-                        "description": "파일 내용을 읽어옵니다",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "filepath": {
-                                    "type": "string",
-                                    "description": "읽을 파일의 경로"
-                                }
-                            },
-                            "required": ["filepath"]
-                        }
-                    },
-                    {
-                        "name": "write_file",
-                        "description": "파일에 내용을 씁니다 (덮어쓰기)",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "filepath": {
-                                    "type": "string",
-                                    "description": "쓸 파일의 경로"
-                                },
-                                "content": {
-                                    "type": "string",
-                                    "description": "파일 내용"
-                                }
-                            },
-                            "required": ["filepath", "content"]
-                        }
-                    },
-                    {
-                        "name": "append_file",
-                        "description": "파일 끝에 내용을 추가합니다",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "filepath": {
-                                    "type": "string",
-                                    "description": "추가할 파일의 경로"
-                                },
-                                "content": {
-                                    "type": "string",
-                                    "description": "추가할 내용"
-                                }
-                            },
-                            "required": ["filepath", "content"]
-                        }
-                    },
-                    {
-                        "name": "update_file",
-                        "description": "파일 내용을 찾아 바꿉니다",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "filepath": {
-                                    "type": "string",
-                                    "description": "수정할 파일의 경로"
-                                },
-                                "find": {
-                                    "type": "string",
-                                    "description": "찾을 문자열"
-                                },
-                                "replace": {
-                                    "type": "string",
-                                    "description": "바꿀 문자열"
-                                }
-                            },
-                            "required": ["filepath", "find", "replace"]
-                        }
-                    },
-                    {
-                        "name": "delete_file",
-                        "description": "파일을 삭제합니다",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "filepath": {
-                                    "type": "string",
-                                    "description": "삭제할 파일의 경로"
-                                }
-                            },
-                            "required": ["filepath"]
-                        }
-                    },
-                    {
-                        "name": "list_files",
-                        "description": "디렉토리 내용을 조회합니다",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "dirpath": {
-                                    "type": "string",
-                                    "description": "조회할 디렉토리 경로"
-                                }
-                            },
-                            "required": ["dirpath"]
-                        }
-                    },
-                    {
-                        "name": "create_directory",
-                        "description": "새 디렉토리를 생성합니다",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "dirpath": {
-                                    "type": "string",
-                                    "description": "생성할 디렉토리 경로"
-                                }
-                            },
-                            "required": ["dirpath"]
-                        }
-                    }
-                ]
-                
-                return MCPResponse(
+                return _json_response(MCPResponse.model_construct(
                     id=request.id if request.id is not None else 0,
-                    result={"tools": tools}
-                )
+                    result=_TOOLS_RESULT
+                ))
             except Exception as e:
                 logger.error(f"List tools error: {e}")
-                return MCPResponse(
+                return _json_response(MCPResponse.model_construct(
                     id=request.id if request.id is not None else 0,
                     error={"code": -1, "message": str(e)}
-                )
+                ))
 
-        @self.app.post("/mcp/tools/call")
+        @self.app.post("/mcp/tools/call", response_model=None)
         async def call_tool(request: MCPRequest):
             """도구 호출"""
             try:
@@ -254,58 +537,165 @@ class MCPServer:
                     raise ValueError("Tool name is required")
                 
                 tool_name = request.params["name"]
-                arguments = request.params.get("arguments", {})
+                arguments = request.params.get("arguments", _EMPTY_ARGUMENTS)
                 
-                # 도구별 처리
-                if tool_name == "read_file":
-                    result = await self.read_file(arguments.get("filepath"))
-                elif tool_name == "write_file":
-                    result = await self.write_file(
-                        arguments.get("filepath"), 
-                        arguments.get("content")
-                    )
-                elif tool_name == "append_file":
-                    result = await self.append_file(
-                        arguments.get("filepath"), 
-                        arguments.get("content")
-                    )
-                elif tool_name == "update_file":
-                    result = await self.update_file(
-                        arguments.get("filepath"),
-                        arguments.get("find"),
-                        arguments.get("replace")
-                    )
-                elif tool_name == "delete_file":
-                    result = await self.delete_file(arguments.get("filepath"))
-                elif tool_name == "list_files":
-                    result = await self.list_files(arguments.get("dirpath"))
-                elif tool_name == "create_directory":
-                    result = await self.create_directory(arguments.get("dirpath"))
-                else:
-                    raise ValueError(f"Unknown tool: {tool_name}")
+                result = await self.dispatch_tool(tool_name, arguments)
                 
-                return MCPResponse(
+                return _json_response(MCPResponse.model_construct(
                     id=request.id if request.id is not None else 0,
-                    result={"content": [{"type": "text", "text": json.dumps(result, ensure_ascii=False)}]}
-                )
+                    result={"content": [{"type": "text", "text": orjson.dumps(result).decode()}]}
+                ))
                 
             except Exception as e:
                 logger.error(f"Tool call error: {e}")
-                return MCPResponse(
+                return _json_response(MCPResponse.model_construct(
                     id=request.id if request.id is not None else 0,
                     error={"code": -1, "message": str(e)}
-                )
+                ))
+
+        @self.app.post("/mcp/tools/stream", response_model=None)
+        async def stream_tool(request: MCPRequest):
+            """read_file_stream 도구 호출 (파일 내용을 application/octet-stream으로 스트리밍)"""
+            try:
+                if not request.params or request.params.get("name") != "read_file_stream":
+                    raise ValueError("Only read_file_stream can be called on /mcp/tools/stream")
+                
+                arguments = request.params.get("arguments", _EMPTY_ARGUMENTS)
+                filepath = arguments.get("filepath")
+                # stdio의 dispatch_tool과 같이 스트리밍이 끝날 때까지 경로 잠금을 잡음 (읽는 중에 덮어쓰지 못하게)
+                body = _iter_encoded_chunks(self._path_lock(filepath), lambda: self.open_file_stream(filepath))
+                # 파일을 열어 보는 단계까지 진행 (열기 오류는 아래에서 JSON 오류 응답으로 반환)
+                await body.__anext__()
+            except Exception as e:
+                logger.error(f"Stream tool error: {e}")
+                return _json_response(MCPResponse.model_construct(
+                    id=request.id if request.id is not None else 0,
+                    error={"code": -1, "message": str(e)}
+                ))
+            
+            # 클라이언트가 중간에 끊어도 제너레이터를 닫아 파일을 닫고 잠금을 해제
+            return StreamingResponse(body, media_type="application/octet-stream",
+                                     background=BackgroundTask(body.aclose))
+
+    async def dispatch_tool(self, tool_name: str, arguments: Dict[str, Any],
+                            notify: Optional[_Notify] = None) -> Dict[str, Any]:
+        """도구 이름에 해당하는 핸들러 호출 (스트리밍 도구는 notify로 청크 전달)"""
+        handler = self._tool_dispatch.get(tool_name)
+        stream_handler = self._stream_tool_dispatch.get(tool_name) if handler is None else None
+        if handler is None and stream_handler is None:
+            raise ValueError(f"Unknown tool: {tool_name}")
+        
+        # 요청은 동시에 처리되므로 같은 경로에 대한 작업만 도착 순서대로 직렬화
+        # (update_file 같은 읽기-수정-쓰기가 서로 덮어쓰지 않도록 함)
+        async with self._path_lock(arguments.get("filepath", arguments.get("dirpath"))):
+            if handler is not None:
+                return await handler(arguments)
+            return await stream_handler(arguments, notify)
+
+    @asynccontextmanager
+    async def _path_lock(self, path: Any):
+        """경로별 잠금 (경로가 문자열이 아니면 잠그지 않음, 쓰는 요청이 없으면 잠금 제거)"""
+        if not isinstance(path, str):
+            yield
+            return
+        key = os.path.normcase(self._abspath(path))
+        entry = self._path_locks.get(key)
+        if entry is None:
+            entry = self._path_locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._path_locks[key]
+
+    # 없는 경로 캐시
+    def _abspath(self, filepath: str) -> str:
+        """시작 시 저장한 작업 디렉토리 기준 절대 경로 (getcwd/Path 객체 없이 문자열 연산만 수행)"""
+        return os.path.normpath(os.path.join(self._cwd, filepath))
+
+    def _is_known_missing(self, key: str) -> bool:
+        """최근 _NEGATIVE_CACHE_TTL초 안에 없다고 확인된 경로인지 확인"""
+        checked_at = self._missing_paths.get(key)
+        if checked_at is None:
+            return False
+        if time.monotonic() - checked_at < _NEGATIVE_CACHE_TTL:
+            return True
+        del self._missing_paths[key]
+        return False
+
+    def _remember_missing(self, key: str):
+        """없는 경로로 기록 (오래된 항목부터 제거)"""
+        self._missing_paths[key] = time.monotonic()
+        self._missing_paths.move_to_end(key)
+        if len(self._missing_paths) > _NEGATIVE_CACHE_SIZE:
+            self._missing_paths.popitem(last=False)
+
+    def _forget_missing(self, key: str):
+        """경로와 상위 경로들을 캐시에서 제거 (파일/디렉토리를 만든 뒤 호출)"""
+        if not self._missing_paths:
+            return
+        while True:
+            self._missing_paths.pop(key, None)
+            parent = os.path.dirname(key)
+            if parent == key:
+                break
+            key = parent
+
+    # 파일 내용 캐시
+    def _get_cached_content(self, key: str, st: os.stat_result) -> Optional[str]:
+        """파일의 (mtime, size)가 캐시했을 때와 같으면 캐시된 내용 반환"""
+        cached = self._content_cache.get(key)
+        if cached is None:
+            return None
+        if cached[0] != (st.st_mtime_ns, st.st_size):
+            del self._content_cache[key]
+            return None
+        self._content_cache.move_to_end(key)
+        return cached[1]
+
+    def _put_cached_content(self, key: str, st: os.stat_result, content: str):
+        """작은 파일의 내용을 캐시 (오래된 항목부터 제거)"""
+        if st.st_size > _CONTENT_CACHE_MAX_FILE_SIZE:
+            return
+        self._content_cache[key] = ((st.st_mtime_ns, st.st_size), content)
+        self._content_cache.move_to_end(key)
+        if len(self._content_cache) > _CONTENT_CACHE_SIZE:
+            self._content_cache.popitem(last=False)
 
     # 파일 시스템 작업 메서드들
-    async def read_file(self, filepath: str) -> Dict[str, Any]:
-        """파일 읽기"""
+    async def read_file(self, filepath: str, max_size: Optional[int] = None) -> Dict[str, Any]:
+        """파일 읽기 (max_size를 주면 그 글자 수까지만 읽음)"""
         try:
             path = Path(filepath)
-            if not path.exists():
+            if max_size is not None and max_size <= 0:
+                raise ValueError(f"max_size must be positive: {max_size}")
+            
+            abspath = self._abspath(filepath)
+            key = os.path.normcase(abspath)
+            if self._is_known_missing(key):
                 raise FileNotFoundError(f"File not found: {filepath}")
             
-            async with aiofiles.open(path, 'r', encoding='utf-8') as f:
-                content = await f.read()
+            # exists() 확인 없이 stat/open이 던지는 예외를 사용
+            try:
+                # 같은 (mtime, size)로 캐시된 내용이 있으면 파일을 다시 읽지 않음
+                st = os.stat(path)
+                content = self._get_cached_content(key, st)
+                if content is not None:
+                    truncated = max_size is not None and len(content) > max_size
+                    if truncated:
+                        content = content[:max_size]
+                elif max_size is None:
+                    content = await asyncio.to_thread(_read_text, path)
+                    truncated = False
+                    self._put_cached_content(key, st, content)
+                else:
+                    content, truncated = await asyncio.to_thread(_read_text_limited, path, max_size)
+            except FileNotFoundError:
+                self._remember_missing(key)
+                raise FileNotFoundError(f"File not found: {filepath}")
             
             return {
                 "success": True,
@@ -313,7 +703,8 @@ class MCPServer:
                 "data": {
                     "content": content,
                     "size": len(content),
-                    "path": str(path.absolute())
+                    "truncated": truncated,
+                    "path": abspath
                 }
             }
         except Exception as e:
@@ -327,17 +718,23 @@ class MCPServer:
     async def write_file(self, filepath: str, content: str) -> Dict[str, Any]:
         """파일 쓰기 (덮어쓰기)"""
         try:
+            if not isinstance(content, str):
+                raise ValueError("content must be a string")
+            
             path = Path(filepath)
             path.parent.mkdir(parents=True, exist_ok=True)
             
-            async with aiofiles.open(path, 'w', encoding='utf-8') as f:
-                await f.write(content)
+            await asyncio.to_thread(_write_text, path, content)
+            abspath = self._abspath(filepath)
+            key = os.path.normcase(abspath)
+            self._forget_missing(key)
+            self._content_cache.pop(key, None)
             
             return {
                 "success": True,
                 "message": f"File written successfully: {filepath}",
                 "data": {
-                    "path": str(path.absolute()),
+                    "path": abspath,
                     "size": len(content)
                 }
             }
@@ -349,20 +746,119 @@ class MCPServer:
                 "data": None
             }
 
+    async def open_file_stream(self, filepath: str) -> Tuple[IO[str], str]:
+        """스트리밍 읽기용으로 파일을 열어 (파일 객체, 절대 경로) 반환"""
+        path = Path(filepath)
+        abspath = self._abspath(filepath)
+        key = os.path.normcase(abspath)
+        if self._is_known_missing(key):
+            raise FileNotFoundError(f"File not found: {filepath}")
+        
+        try:
+            f = await asyncio.to_thread(_open_text, path)
+        except FileNotFoundError:
+            self._remember_missing(key)
+            raise FileNotFoundError(f"File not found: {filepath}")
+        return f, abspath
+
+    async def read_file_stream(self, filepath: str, notify: Optional[_Notify] = None) -> Dict[str, Any]:
+        """파일을 청크 단위로 읽어 notify로 전달 (마지막에 eof 알림)"""
+        try:
+            if notify is None:
+                raise ValueError("read_file_stream requires a streaming transport (stdio or /mcp/tools/stream)")
+            
+            f, abspath = await self.open_file_stream(filepath)
+            size = 0
+            seq = 0
+            async for chunk in _iter_chunks(f):
+                await notify({"seq": seq, "chunk": chunk, "eof": False})
+                size += len(chunk)
+                seq += 1
+            await notify({"seq": seq, "chunk": "", "eof": True})
+            
+            return {
+                "success": True,
+                "message": f"File streamed successfully: {filepath}",
+                "data": {
+                    "path": abspath,
+                    "size": size,
+                    "chunks": seq
+                }
+            }
+        except Exception as e:
+            logger.error(f"Read file stream error: {e}")
+            return {
+                "success": False,
+                "message": f"Failed to stream file: {str(e)}",
+                "data": None
+            }
+
+    async def write_file_stream(self, filepath: str, chunk: str, seq: int) -> Dict[str, Any]:
+        """청크 하나 쓰기 (seq 0이면 덮어쓰고, 이후 seq는 바로 앞 seq 다음 번호일 때만 파일 끝에 이어 씀)"""
+        try:
+            if not isinstance(seq, int) or seq < 0:
+                raise ValueError(f"seq must be a non-negative integer: {seq}")
+            if not isinstance(chunk, str):
+                raise ValueError("chunk must be a string")
+            
+            abspath = self._abspath(filepath)
+            key = os.path.normcase(abspath)
+            # 같은 경로 요청은 dispatch_tool에서 하나씩 실행되므로 확인과 쓰기 사이에 끼어드는 청크가 없음
+            if seq > 0:
+                expected = self._stream_next_seq.get(key)
+                if expected is None:
+                    raise ValueError(f"seq {seq} received before seq 0")
+                if seq != expected:
+                    raise ValueError(f"Out-of-order chunk: expected seq {expected}, got {seq}")
+            
+            path = Path(filepath)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            
+            await asyncio.to_thread(_write_text if seq == 0 else _append_text, path, chunk)
+            self._stream_next_seq[key] = seq + 1
+            self._stream_next_seq.move_to_end(key)
+            if len(self._stream_next_seq) > _STREAM_WRITE_STATE_SIZE:
+                self._stream_next_seq.popitem(last=False)
+            self._forget_missing(key)
+            self._content_cache.pop(key, None)
+            
+            return {
+                "success": True,
+                "message": f"Chunk {seq} written successfully: {filepath}",
+                "data": {
+                    "path": abspath,
+                    "seq": seq,
+                    "size": len(chunk)
+                }
+            }
+        except Exception as e:
+            logger.error(f"Write file stream error: {e}")
+            return {
+                "success": False,
+                "message": f"Failed to write chunk: {str(e)}",
+                "data": None
+            }
+
     async def append_file(self, filepath: str, content: str) -> Dict[str, Any]:
         """파일 끝에 내용 추가"""
         try:
+            if not isinstance(content, str):
+                raise ValueError("content must be a string")
+            
             path = Path(filepath)
             path.parent.mkdir(parents=True, exist_ok=True)
             
-            async with aiofiles.open(path, 'a', encoding='utf-8') as f:
-                await f.write(content)
+            await asyncio.to_thread(_append_text, path, content)
+            abspath = self._abspath(filepath)
+            key = os.path.normcase(abspath)
+            self._forget_missing(key)
+            self._content_cache.pop(key, None)
             
             return {
                 "success": True,
                 "message": f"Content appended successfully: {filepath}",
                 "data": {
-                    "path": str(path.absolute()),
+                    "path": abspath,
                     "appended_size": len(content)
                 }
             }
@@ -378,32 +874,35 @@ class MCPServer:
         """파일 내용 찾아 바꾸기"""
         try:
             path = Path(filepath)
-            if not path.exists():
+            abspath = self._abspath(filepath)
+            key = os.path.normcase(abspath)
+            if self._is_known_missing(key):
                 raise FileNotFoundError(f"File not found: {filepath}")
             
-            async with aiofiles.open(path, 'r', encoding='utf-8') as f:
-                content = await f.read()
-            
-            original_content = content
-            content = content.replace(find, replace)
+            try:
+                replacements = await asyncio.to_thread(_replace_text, path, find, replace)
+            except FileNotFoundError:
+                self._remember_missing(key)
+                raise FileNotFoundError(f"File not found: {filepath}")
+            if replacements:
+                self._content_cache.pop(key, None)
             
-            if content == original_content:
+            if replacements == 0:
+                if find == replace:
+                    message = f"No changes made: find and replace are identical for {filepath}"
+                else:
+                    message = f"No changes made: '{find}' not found in {filepath}"
                 return {
                     "success": True,
-                    "message": f"No changes made: '{find}' not found in {filepath}",
+                    "message": message,
                     "data": {"replacements": 0}
                 }
             
-            async with aiofiles.open(path, 'w', encoding='utf-8') as f:
-                await f.write(content)
-            
-            replacements = original_content.count(find)
-            
             return {
                 "success": True,
                 "message": f"File updated successfully: {filepath}",
                 "data": {
-                    "path": str(path.absolute()),
+                    "path": abspath,
                     "replacements": replacements
                 }
             }
@@ -419,15 +918,23 @@ class MCPServer:
         """파일 삭제"""
         try:
             path = Path(filepath)
-            if not path.exists():
+            abspath = self._abspath(filepath)
+            key = os.path.normcase(abspath)
+            if self._is_known_missing(key):
                 raise FileNotFoundError(f"File not found: {filepath}")
             
-            path.unlink()
+            self._content_cache.pop(key, None)
+            self._stream_next_seq.pop(key, None)
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                self._remember_missing(key)
+                raise FileNotFoundError(f"File not found: {filepath}")
             
             return {
                 "success": True,
                 "message": f"File deleted successfully: {filepath}",
-                "data": {"path": str(path.absolute())}
+                "data": {"path": abspath}
             }
         except Exception as e:
             logger.error(f"Delete file error: {e}")
@@ -441,31 +948,31 @@ class MCPServer:
         """디렉토리 내용 조회"""
         try:
             path = Path(dirpath)
-            if not path.exists():
+            abspath = self._abspath(dirpath)
+            key = os.path.normcase(abspath)
+            if self._is_known_missing(key):
                 raise FileNotFoundError(f"Directory not found: {dirpath}")
             
-            if not path.is_dir():
+            try:
+                entries = await asyncio.to_thread(_scan_dir, path)
+            except FileNotFoundError:
+                self._remember_missing(key)
+                raise FileNotFoundError(f"Directory not found: {dirpath}")
+            except NotADirectoryError:
                 raise NotADirectoryError(f"Not a directory: {dirpath}")
             
-            items = []
-            for item in path.iterdir():
-                try:
-                    stat = item.stat()
-                    items.append({
-                        "name": item.name,
-                        "type": "directory" if item.is_dir() else "file",
-                        "size": stat.st_size if item.is_file() else None,
-                        "modified": str(stat.st_mtime)
-                    })
-                except (PermissionError, OSError):
-                    # 권한이 없거나 접근할 수 없는 파일은 건너뛰기
-                    continue
+            # 디렉토리 항목에는 size 키를 넣지 않음
+            items = [
+                {"name": name, "type": "directory", "modified": str(mtime)} if is_dir
+                else {"name": name, "type": "file", "size": size, "modified": str(mtime)}
+                for name, is_dir, size, mtime in entries
+            ]
             
             return {
                 "success": True,
                 "message": f"Directory listed successfully: {dirpath}",
                 "data": {
-                    "path": str(path.absolute()),
+                    "path": abspath,
                     "items": items,
                     "count": len(items)
                 }
@@ -483,11 +990,13 @@ class MCPServer:
         try:
             path = Path(dirpath)
             path.mkdir(parents=True, exist_ok=True)
+            abspath = self._abspath(dirpath)
+            self._forget_missing(os.path.normcase(abspath))
             
             return {
                 "success": True,
                 "message": f"Directory created successfully: {dirpath}",
-                "data": {"path": str(path.absolute())}
+                "data": {"path": abspath}
             }
         except Exception as e:
             logger.error(f"Create directory error: {e}")
@@ -497,272 +1006,421 @@ class MCPServer:
                 "data": None
             }
 
+# 프로세스 전체에서 공유하는 MCPServer (라우트/도구 테이블/캐시를 한 번만 생성)
+_server_instance: Optional[MCPServer] = None
+
+def _get_server() -> MCPServer:
+    """공유 MCPServer 인스턴스 반환 (처음 호출할 때 생성)"""
+    global _server_instance
+    if _server_instance is None:
+        _server_instance = MCPServer()
+    return _server_instance
+
+# stdout 한 번의 write + flush로 묶어 보낼 최대 응답 수
+_WRITE_BATCH_SIZE = 64
+
+# stdio에서 동시에 처리할 최대 요청 수
+_MAX_CONCURRENT_REQUESTS = 32
+
+# stdin 한 줄(JSON-RPC 메시지 하나)의 최대 크기
+_MAX_MESSAGE_SIZE = 256 * 1024 * 1024
+
+# MessagePack 모드에서 메시지 앞에 붙는 길이 헤더 크기 (big-endian)
+_FRAME_HEADER_SIZE = 4
+
+# stdio 파이프 버퍼 크기 (Linux 기본 64 KiB -> 1 MiB, MCP_PIPE_BUFSIZE로 변경 가능)
+_DEFAULT_PIPE_SIZE = 1 << 20
+
+# Python 3.10 미만에는 fcntl.F_SETPIPE_SZ 상수가 없음 (Linux 값 1031)
+_F_SETPIPE_SZ = getattr(fcntl, "F_SETPIPE_SZ", 1031) if fcntl is not None else None
+
+def _pipe_size() -> int:
+    """MCP_PIPE_BUFSIZE 환경 변수에서 파이프 버퍼 크기를 읽음 (잘못된 값이면 경고 후 기본값)"""
+    value = os.environ.get("MCP_PIPE_BUFSIZE")
+    if value is None:
+        return _DEFAULT_PIPE_SIZE
+    try:
+        size = int(value)
+    except ValueError:
+        size = 0
+    if size <= 0:
+        logger.warning(f"Invalid MCP_PIPE_BUFSIZE {value!r}, using default {_DEFAULT_PIPE_SIZE}")
+        return _DEFAULT_PIPE_SIZE
+    return size
+
+def _grow_pipe(fileobj) -> None:
+    """Linux에서 파이프 버퍼를 늘려 큰 메시지를 적은 write/read로 주고받도록 함 (실패하면 무시)"""
+    if _F_SETPIPE_SZ is None or not sys.platform.startswith("linux"):
+        return
+    size = _pipe_size()
+    try:
+        fcntl.fcntl(fileobj.fileno(), _F_SETPIPE_SZ, size)
+        return
+    except OverflowError:
+        pass
+    except OSError as e:
+        # 소켓 등 파이프가 아닌 경우(EBADF)나 기본값도 거부된 경우: 커널 기본 크기 유지
+        if e.errno not in (errno.EPERM, errno.EINVAL) or size == _DEFAULT_PIPE_SIZE:
+            return
+    except ValueError:
+        return
+    # MCP_PIPE_BUFSIZE가 pipe-max-size 제한을 넘는 경우: 기본값으로 다시 시도
+    logger.warning(f"MCP_PIPE_BUFSIZE {size} is too large, using default {_DEFAULT_PIPE_SIZE}")
+    try:
+        fcntl.fcntl(fileobj.fileno(), _F_SETPIPE_SZ, _DEFAULT_PIPE_SIZE)
+    except (OSError, ValueError):
+        pass
+
+def _is_pipe_or_socket(fileobj) -> bool:
+    """이벤트 루프에 파이프로 연결할 수 있는 fd인지 확인 (일반 파일/tty는 uvloop에서 연결 불가)"""
+    try:
+        mode = os.fstat(fileobj.fileno()).st_mode
+    except (OSError, ValueError):
+        return False
+    return stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode)
+
+# stdout 파이프 쓰기용 프로토콜 (asyncio 내부 FlowControlMixin 대신 공개 Protocol API만 사용)
+class _PipeWriterProtocol(asyncio.Protocol):
+    def __init__(self):
+        self._paused = False
+        self._drain_waiter: Optional[asyncio.Future] = None
+        self._lost: Optional[BaseException] = None
+    
+    def pause_writing(self):
+        """transport 버퍼가 가득 참"""
+        self._paused = True
+    
+    def resume_writing(self):
+        """transport 버퍼가 비워짐: drain 대기 해제"""
+        self._paused = False
+        self._wake(None)
+    
+    def connection_lost(self, exc: Optional[BaseException]):
+        """파이프가 닫힘: 이후 drain은 예외 발생"""
+        self._lost = exc if exc is not None else ConnectionResetError("stdout is closed")
+        self._wake(self._lost)
+    
+    def _wake(self, exc: Optional[BaseException]):
+        waiter, self._drain_waiter = self._drain_waiter, None
+        if waiter is None or waiter.done():
+            return
+        if exc is None:
+            waiter.set_result(None)
+        else:
+            waiter.set_exception(exc)
+    
+    async def drain(self):
+        """버퍼가 다시 비워질 때까지 대기 (파이프가 닫혔으면 예외)"""
+        if self._lost is not None:
+            raise self._lost
+        if not self._paused:
+            return
+        self._drain_waiter = asyncio.get_running_loop().create_future()
+        await self._drain_waiter
+
 # MCP stdio 서버 (표준 입출력 기반)
 class MCPStdioServer:
-    def __init__(self):
-        self.server = MCPServer()
+    def __init__(self, server: Optional[MCPServer] = None, use_msgpack: bool = False):
+        self.server = server if server is not None else _get_server()
         self.running = False
+        # True면 줄 단위 JSON 대신 길이 접두 MessagePack 프레임으로 주고받음
+        self.use_msgpack = use_msgpack
+        # (출력할 바이트, 출력 완료를 알릴 future 또는 None) 항목의 큐
+        self._write_queue: Optional[asyncio.Queue] = None
+        # stdout 쓰기에 실패하면 저장 (이후 출력은 버리고 알림을 보내는 쪽에 이 오류를 전달)
+        self._write_error: Optional[BaseException] = None
+        self._request_slots: Optional[asyncio.Semaphore] = None
+        self._pending_tasks = set()
     
     async def handle_stdio(self):
         """표준 입출력을 통한 MCP 통신 처리"""
         self.running = True
-        print("🔧 MCP Server started - waiting for requests...")
-        print("=" * 50)
+        loop = asyncio.get_running_loop()
+        self._write_queue = asyncio.Queue()
+        self._write_error = None
+        self._request_slots = asyncio.Semaphore(_MAX_CONCURRENT_REQUESTS)
         
+        read_line = await self._connect_stdin(loop)
+        write_out, stdout_transport = await self._connect_stdout(loop)
+        writer_task = asyncio.create_task(self._write_stdout(write_out))
+        
+        # stdout은 JSON-RPC 응답 전용이므로 로그는 logger(stderr)로만 출력
+        logger.info("🔧 MCP Server started - waiting for requests...")
+        
+        try:
+            await self._serve(read_line)
+        finally:
+            # 남은 응답을 모두 내보낸 뒤 writer 종료
+            self._write_queue.put_nowait(None)
+            await writer_task
+            if stdout_transport is not None:
+                stdout_transport.close()
+    
+    async def _connect_stdin(self, loop: asyncio.AbstractEventLoop):
+        """stdin에서 메시지 하나(JSON 한 줄 또는 MessagePack 프레임 본문)를 읽는 코루틴 함수 반환"""
+        if sys.platform != "win32" and _is_pipe_or_socket(sys.stdin):
+            # POSIX 파이프: stdin을 이벤트 루프에 직접 연결 (executor/스레드 없이 읽기)
+            _grow_pipe(sys.stdin)
+            reader = asyncio.StreamReader(limit=_MAX_MESSAGE_SIZE)
+            try:
+                await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+            except (ValueError, OSError):
+                pass
+            else:
+                if not self.use_msgpack:
+                    return reader.readline
+                
+                async def read_frame():
+                    try:
+                        header = await reader.readexactly(_FRAME_HEADER_SIZE)
+                        size = int.from_bytes(header, "big")
+                        if size > _MAX_MESSAGE_SIZE:
+                            raise ValueError(f"Message too large: {size} bytes")
+                        return await reader.readexactly(size)
+                    except asyncio.IncompleteReadError:
+                        # EOF (프레임 도중에 끊긴 경우 포함)
+                        return b""
+                
+                return read_frame
+        
+        # Windows, 파일/tty 입력 또는 연결 실패 시: 전용 스레드 하나가 stdin을 읽어 큐로 전달
+        read_queue = asyncio.Queue()
+        target = self._read_stdin_frames if self.use_msgpack else self._read_stdin
+        threading.Thread(target=target, args=(loop, read_queue), daemon=True).start()
+        return read_queue.get
+    
+    async def _connect_stdout(self, loop: asyncio.AbstractEventLoop):
+        """(stdout 쓰기 코루틴 함수, 닫아야 할 transport) 반환"""
+        if sys.platform != "win32" and _is_pipe_or_socket(sys.stdout):
+            _grow_pipe(sys.stdout)
+            try:
+                transport, protocol = await loop.connect_write_pipe(_PipeWriterProtocol, sys.stdout)
+            except (ValueError, OSError):
+                pass
+            else:
+                async def write_pipe(data: bytes):
+                    if transport.is_closing():
+                        raise ConnectionResetError("stdout is closed")
+                    transport.write(data)
+                    await protocol.drain()
+                
+                return write_pipe, transport
+        
+        # Windows, 파일/tty 출력 또는 연결 실패 시: executor에서 write + flush
+        async def write_executor(data: bytes):
+            await loop.run_in_executor(None, self._flush_stdout, data)
+        
+        return write_executor, None
+    
+    @staticmethod
+    def _read_stdin(loop: asyncio.AbstractEventLoop, queue: asyncio.Queue):
+        """stdin을 줄 단위로 읽어 이벤트 루프의 큐로 전달 (전용 스레드에서 실행)"""
+        try:
+            for line in sys.stdin:
+                loop.call_soon_threadsafe(queue.put_nowait, line)
+            # EOF 표시
+            loop.call_soon_threadsafe(queue.put_nowait, "")
+        except RuntimeError:
+            # 이벤트 루프가 이미 닫힌 경우
+            pass
+    
+    @staticmethod
+    def _read_stdin_frames(loop: asyncio.AbstractEventLoop, queue: asyncio.Queue):
+        """stdin에서 길이 접두 프레임을 읽어 본문을 이벤트 루프의 큐로 전달 (전용 스레드에서 실행)"""
+        stdin = sys.stdin.buffer
+        try:
+            while True:
+                header = stdin.read(_FRAME_HEADER_SIZE)
+                if len(header) < _FRAME_HEADER_SIZE:
+                    break
+                size = int.from_bytes(header, "big")
+                if size > _MAX_MESSAGE_SIZE:
+                    logger.error(f"Stdio handling error: Message too large: {size} bytes")
+                    break
+                body = stdin.read(size)
+                if len(body) < size:
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, body)
+            # EOF 표시
+            loop.call_soon_threadsafe(queue.put_nowait, b"")
+        except RuntimeError:
+            # 이벤트 루프가 이미 닫힌 경우
+            pass
+    
+    async def _write_stdout(self, write_out):
+        """응답 큐에 쌓인 응답들을 한 번의 쓰기로 묶어 출력"""
+        while True:
+            batch = []
+            waiters = []
+            item = await self._write_queue.get()
+            while item is not None:
+                data, waiter = item
+                batch.append(data)
+                if waiter is not None:
+                    waiters.append(waiter)
+                if len(batch) >= _WRITE_BATCH_SIZE or self._write_queue.empty():
+                    break
+                item = self._write_queue.get_nowait()
+            
+            if batch and self._write_error is None:
+                try:
+                    await write_out(b"".join(batch))
+                except Exception as e:
+                    # stdout이 닫힌 경우 등: writer는 종료하지 않고 남은 항목을 버리며 대기 중인 쪽에 오류 전달
+                    logger.error(f"Stdout write error: {e}")
+                    self._write_error = e
+            # 스트리밍 알림을 보낸 쪽은 자기 알림이 출력(또는 실패)될 때까지 기다림
+            for waiter in waiters:
+                if waiter.done():
+                    continue
+                if self._write_error is None:
+                    waiter.set_result(None)
+                else:
+                    waiter.set_exception(self._write_error)
+            if item is None:
+                break
+    
+    @staticmethod
+    def _flush_stdout(data: bytes):
+        """stdout 바이너리 버퍼에 쓰고 바로 flush (텍스트 레이어의 인코딩 생략)"""
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+    
+    async def _serve(self, read_line):
+        """stdin에서 JSON-RPC 메시지를 읽어 처리"""
+        decoder = _MSGPACK_REQUEST_DECODER if self.use_msgpack else _REQUEST_DECODER
         while self.running:
             try:
                 # 표준 입력에서 JSON-RPC 메시지 읽기
-                line = await asyncio.get_event_loop().run_in_executor(None, sys.stdin.readline)
+                line = await read_line()
                 if not line:
                     break
                 
-                line = line.strip()
-                if not line:
-                    continue
+                if not self.use_msgpack:
+                    line = line.strip()
+                    if not line:
+                        continue
                 
-                # JSON 파싱
+                # JSON / MessagePack 파싱
                 try:
-                    request_data = json.loads(line)
-                    request = MCPRequest(**request_data)
+                    request = decoder.decode(line)
                     
-                    # 요청 로그 출력
-                    print(f"📥 MCP Request: {request.method} (ID: {request.id})")
-                    if request.params:
-                        print(f"   Params: {json.dumps(request.params, ensure_ascii=False, indent=2)}")
-                    print("-" * 50)
+                    # 요청 로그 출력 (DEBUG일 때만 직렬화)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("📥 MCP Request: %s (ID: %s)", request.method, request.id)
+                        if request.params:
+                            logger.debug("   Params: %s", orjson.dumps(request.params, option=orjson.OPT_INDENT_2).decode())
                     
-                except json.JSONDecodeError as e:
-                    logger.error(f"JSON decode error: {e}")
-                    print(f"❌ JSON Decode Error: {e}")
-                    continue
-                except Exception as e:
+                except msgspec.ValidationError as e:
                     logger.error(f"Request parsing error: {e}")
-                    print(f"❌ Request Parsing Error: {e}")
+                    continue
+                except msgspec.DecodeError as e:
+                    logger.error(f"{'MessagePack' if self.use_msgpack else 'JSON'} decode error: {e}")
                     continue
                 
-                # 요청 처리
-                response = await self.process_request(request)
-                
-                # 응답 로그 출력
-                print(f"📤 MCP Response: {request.method} (ID: {request.id})")
-                if hasattr(response, 'result') and response.result is not None:
-                    print(f"   Result: {json.dumps(response.result, ensure_ascii=False, indent=2)}")
-                elif hasattr(response, 'error') and response.error is not None:
-                    print(f"   Error: {json.dumps(response.error, ensure_ascii=False, indent=2)}")
-                print("=" * 50)
-                
-                # 응답 전송
-                response_data = {
-                    "jsonrpc": "2.0",
-                    "id": request.id if request.id is not None else 0
-                }
-                
-                if hasattr(response, 'result') and response.result is not None:
-                    response_data["result"] = response.result
-                elif hasattr(response, 'error') and response.error is not None:
-                    response_data["error"] = response.error
-                
-                response_json = json.dumps(response_data, ensure_ascii=False)
-                await asyncio.get_event_loop().run_in_executor(
-                    None, lambda: sys.stdout.write(response_json + "\n")
-                )
-                await asyncio.get_event_loop().run_in_executor(None, sys.stdout.flush)
+                # 요청 처리: 응답을 기다리지 않고 다음 메시지를 읽음 (동시 처리 수는 제한)
+                await self._request_slots.acquire()
+                task = asyncio.create_task(self._handle_and_respond(request))
+                self._pending_tasks.add(task)
+                task.add_done_callback(self._pending_tasks.discard)
                 
             except Exception as e:
                 logger.error(f"Stdio handling error: {e}")
-                print(f"❌ Stdio Handling Error: {e}")
                 break
+        
+        # 처리 중인 요청의 응답까지 모두 보낸 뒤 종료
+        if self._pending_tasks:
+            await asyncio.gather(*self._pending_tasks, return_exceptions=True)
     
-    async def process_request(self, request: MCPRequest) -> MCPResponse:
+    async def _handle_and_respond(self, request: MCPRequestMsg):
+        """요청 하나를 처리하고 응답을 writer 큐에 넣음 (응답 순서는 완료 순, 클라이언트는 id로 구분)"""
+        try:
+            response = await self.process_request(request)
+            
+            # 응답 로그 출력 (DEBUG일 때만 직렬화)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("📤 MCP Response: %s (ID: %s)", request.method, request.id)
+                if response.result is not None:
+                    logger.debug("   Result: %s", orjson.dumps(response.result, option=orjson.OPT_INDENT_2).decode())
+                elif response.error is not None:
+                    logger.debug("   Error: %s", orjson.dumps(response.error, option=orjson.OPT_INDENT_2).decode())
+            
+            # 응답 전송
+            if self.use_msgpack:
+                self._write_queue.put_nowait((_encode_msgpack_frame(response), None))
+            else:
+                self._write_queue.put_nowait((_encode_response(response) + b"\n", None))
+        finally:
+            self._request_slots.release()
+    
+    def _notifier(self, request_id: Optional[Union[str, int]]) -> _Notify:
+        """스트리밍 도구의 청크를 notifications/file_chunk 알림으로 보내는 콜백 생성"""
+        async def notify(params: Dict[str, Any]):
+            message = {
+                "jsonrpc": "2.0",
+                "method": "notifications/file_chunk",
+                "params": {"requestId": request_id, **params}
+            }
+            if self._write_error is not None:
+                raise self._write_error
+            data = _frame_msgpack(message) if self.use_msgpack else orjson.dumps(message) + b"\n"
+            # 이 알림이 stdout에 쓰일 때까지 기다려서 큰 파일도 큐에 한꺼번에 쌓이지 않게 함
+            # (다른 요청의 응답은 기다리지 않고, 쓰기에 실패하면 오류로 끝남)
+            waiter = asyncio.get_running_loop().create_future()
+            self._write_queue.put_nowait((data, waiter))
+            await waiter
+        return notify
+    
+    async def dispatch(self, request: Dict[str, Any],
+                       on_notification: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """요청 dict를 처리해 응답 dict 반환 (stdio 프레임/직렬화 없이 같은 프로세스에서 호출)"""
+        request_msg = msgspec.convert(request, MCPRequestMsg)
+        
+        async def notify(params: Dict[str, Any]):
+            if on_notification is not None:
+                on_notification({"requestId": request_msg.id, **params})
+        
+        response = await self.process_request(request_msg, notify)
+        return _response_message(response)
+    
+    async def process_request(self, request: Union[MCPRequest, MCPRequestMsg],
+                              notify: Optional[_Notify] = None) -> MCPResponse:
         """요청 처리"""
-        print(f"🔄 Processing request: {request.method}")
+        logger.debug("🔄 Processing request: %s", request.method)
         try:
             if request.method == "initialize":
-                return MCPResponse(
+                return MCPResponse.model_construct(
                     id=request.id if request.id is not None else 0,
-                    result={
-                        "protocolVersion": "2024-11-05",
-                        "capabilities": {
-                            "tools": {
-                                "listChanged": True
-                            }
-                        },
-                        "serverInfo": {
-                            "name": "local-file-crud-mcp",
-                            "version": "1.0.0"
-                        }
-                    }
+                    result=_INITIALIZE_RESULT
                 )
             elif request.method == "tools/list":
-                tools = [
-                    {
-                        "name": "read_file",
-                        "description": "파일 내용을 읽어옵니다",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "filepath": {
-                                    "type": "string",
-                                    "description": "읽을 파일의 경로"
-                                }
-                            },
-                            "required": ["filepath"]
-                        }
-                    },
-                    {
-                        "name": "write_file",
-                        "description": "파일에 내용을 씁니다 (덮어쓰기)",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "filepath": {
-                                    "type": "string",
-                                    "description": "쓸 파일의 경로"
-                                },
-                                "content": {
-                                    "type": "string",
-                                    "description": "파일 내용"
-                                }
-                            },
-                            "required": ["filepath", "content"]
-                        }
-                    },
-                    {
-                        "name": "append_file",
-                        "description": "파일 끝에 내용을 추가합니다",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "filepath": {
-                                    "type": "string",
-                                    "description": "추가할 파일의 경로"
-                                },
-                                "content": {
-                                    "type": "string",
-                                    "description": "추가할 내용"
-                                }
-                            },
-                            "required": ["filepath", "content"]
-                        }
-                    },
-                    {
-                        "name": "update_file",
-                        "description": "파일 내용을 찾아 바꿉니다",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "filepath": {
-                                    "type": "string",
-                                    "description": "수정할 파일의 경로"
-                                },
-                                "find": {
-                                    "type": "string",
-                                    "description": "찾을 문자열"
-                                },
-                                "replace": {
-                                    "type": "string",
-                                    "description": "바꿀 문자열"
-                                }
-                            },
-                            "required": ["filepath", "find", "replace"]
-                        }
-                    },
-                    {
-                        "name": "delete_file",
-                        "description": "파일을 삭제합니다",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "filepath": {
-                                    "type": "string",
-                                    "description": "삭제할 파일의 경로"
-                                }
-                            },
-                            "required": ["filepath"]
-                        }
-                    },
-                    {
-                        "name": "list_files",
-                        "description": "디렉토리 내용을 조회합니다",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "dirpath": {
-                                    "type": "string",
-                                    "description": "조회할 디렉토리 경로"
-                                }
-                            },
-                            "required": ["dirpath"]
-                        }
-                    },
-                    {
-                        "name": "create_directory",
-                        "description": "새 디렉토리를 생성합니다",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "dirpath": {
-                                    "type": "string",
-                                    "description": "생성할 디렉토리 경로"
-                                }
-                            },
-                            "required": ["dirpath"]
-                        }
-                    }
-                ]
-                
-                return MCPResponse(
+                return MCPResponse.model_construct(
                     id=request.id if request.id is not None else 0,
-                    result={"tools": tools}
+                    result=_TOOLS_RESULT
                 )
             elif request.method == "tools/call":
                 if not request.params or "name" not in request.params:
                     raise ValueError("Tool name is required")
                 
                 tool_name = request.params["name"]
-                arguments = request.params.get("arguments", {})
+                arguments = request.params.get("arguments", _EMPTY_ARGUMENTS)
                 
-                # 도구별 처리
-                if tool_name == "read_file":
-                    result = await self.server.read_file(arguments.get("filepath"))
-                elif tool_name == "write_file":
-                    result = await self.server.write_file(
-                        arguments.get("filepath"), 
-                        arguments.get("content")
-                    )
-                elif tool_name == "append_file":
-                    result = await self.server.append_file(
-                        arguments.get("filepath"), 
-                        arguments.get("content")
-                    )
-                elif tool_name == "update_file":
-                    result = await self.server.update_file(
-                        arguments.get("filepath"),
-                        arguments.get("find"),
-                        arguments.get("replace")
-                    )
-                elif tool_name == "delete_file":
-                    result = await self.server.delete_file(arguments.get("filepath"))
-                elif tool_name == "list_files":
-                    result = await self.server.list_files(arguments.get("dirpath"))
-                elif tool_name == "create_directory":
-                    result = await self.server.create_directory(arguments.get("dirpath"))
-                else:
-                    raise ValueError(f"Unknown tool: {tool_name}")
+                if notify is None:
+                    notify = self._notifier(request.id)
+                result = await self.server.dispatch_tool(tool_name, arguments, notify)
                 
-                return MCPResponse(
+                return MCPResponse.model_construct(
                     id=request.id if request.id is not None else 0,
-                    result={"content": [{"type": "text", "text": json.dumps(result, ensure_ascii=False)}]}
+                    result={"content": [{"type": "text", "text": orjson.dumps(result).decode()}]}
                 )
             else:
-                return MCPResponse(
+                return MCPResponse.model_construct(
                     id=request.id if request.id is not None else 0,
                     error={"code": -32601, "message": f"Method not found: {request.method}"}
                 )
         except Exception as e:
             logger.error(f"Request processing error: {e}")
-            print(f"❌ Request Processing Error: {e}")
-            return MCPResponse(
+            return MCPResponse.model_construct(
                 id=request.id if request.id is not None else 0,
                 error={"code": -1, "message": str(e)}
             )
@@ -770,20 +1428,33 @@ class MCPStdioServer:
 # 웹 서버 실행 (개발용)
 async def run_web_server():
     """FastAPI 웹 서버 실행 (개발 및 테스트용)"""
-    server = MCPServer()
+    server = _get_server()
     config = uvicorn.Config(
         server.app,
         host="127.0.0.1",
         port=8000,
-        log_level="info"
+        # 요청마다 찍히는 액세스 로그를 끄고, C로 구현된 httptools 파서 사용
+        log_level="warning",
+        access_log=False,
+        http="httptools",
+        # startup/shutdown 훅과 WebSocket 라우트가 없으므로 lifespan/ws 처리 생략
+        lifespan="off",
+        ws="none",
     )
     web_server = uvicorn.Server(config)
     await web_server.serve()
 
+# 이벤트 루프 실행
+def run_event_loop(main):
+    """uvloop이 설치되어 있으면 uvloop 이벤트 루프로, 아니면 기본 asyncio 루프로 실행"""
+    if uvloop is not None:
+        return uvloop.run(main)
+    return asyncio.run(main)
+
 # MCP stdio 서버 실행 (프로덕션용)
-async def run_mcp_server():
+async def run_mcp_server(use_msgpack: bool = False):
     """MCP stdio 서버 실행 (Claude Desktop 연동용)"""
-    stdio_server = MCPStdioServer()
+    stdio_server = MCPStdioServer(_get_server(), use_msgpack=use_msgpack)
     await stdio_server.handle_stdio()
 
 if __name__ == "__main__":
@@ -791,7 +1462,7 @@ if __name__ == "__main__":
     
     if len(sys.argv) > 1 and sys.argv[1] == "--web":
         # 웹 서버 모드 (개발용)
-        asyncio.run(run_web_server())
+        run_event_loop(run_web_server())
     else:
-        # MCP stdio 서버 모드 (프로덕션용)
-        asyncio.run(run_mcp_server()) 
\ No newline at end of file
+        # MCP stdio 서버 모드 (프로덕션용, --msgpack이면 MessagePack 프레임 사용)
+        run_event_loop(run_mcp_server(use_msgpack="--msgpack" in sys.argv[1:])) 
\ No newline at end of file
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+테스트 스크립트 공용 헬퍼 (서버 준비 대기)
+"""
+
+import asyncio
+from typing import Awaitable, Callable
+
+# 서버 준비 확인 간격: 5ms부터 두 배씩 늘려 최대 100ms
+_PROBE_INITIAL_DELAY = 0.005
+_PROBE_MAX_DELAY = 0.1
+
+def _exit_code(proc):
+    """subprocess.Popen / asyncio.subprocess.Process 모두에서 종료 코드 확인 (실행 중이면 None)"""
+    if hasattr(proc, "poll"):
+        return proc.poll()
+    return proc.returncode
+
+def tcp_probe(host: str, port: int) -> Callable[[], Awaitable[None]]:
+    """host:port에 TCP 접속이 되는지 확인하는 probe 생성"""
+    async def probe():
+        _, writer = await asyncio.open_connection(host, port)
+        writer.close()
+        await writer.wait_closed()
+    return probe
+
+async def wait_process_ready(proc, probe: Callable[[], Awaitable[None]], timeout: float = 10):
+    """probe가 성공할 때까지 점점 간격을 늘려 재시도 (프로세스가 먼저 종료되면 실패)"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    attempt = 0
+    while True:
+        code = _exit_code(proc)
+        if code is not None:
+            raise RuntimeError(f"Server process exited with code {code}")
+        try:
+            await probe()
+            return
+        except (OSError, asyncio.TimeoutError):
+            pass
+        if loop.time() >= deadline:
+            raise TimeoutError(f"Server did not start within {timeout} seconds")
+        await asyncio.sleep(min(_PROBE_INITIAL_DELAY * 2 ** attempt, _PROBE_MAX_DELAY))
+        attempt += 1
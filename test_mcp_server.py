@@ -4,49 +4,81 @@ FastAPI MCP 서버 테스트 스크립트
 """
 
 import asyncio
-import json
+import msgspec
+import orjson
+import os
 import sys
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Any, Callable, Dict
 
-# 테스트용 MCP 클라이언트 클래스
-class MCPTestClient:
-    def __init__(self, server_process):
-        self.server_process = server_process
+from test_helpers import wait_process_ready
+
+# 준비 확인용 tools/list 요청 하나의 응답 대기 시간 (초)
+_PING_TIMEOUT = 1.0
+
+# 서버 stdout StreamReader의 한 줄 최대 크기 (큰 read_file 응답도 한 줄로 읽을 수 있도록)
+_STREAM_LIMIT = 64 * 1024 * 1024
+
+# MCP_TEST_MSGPACK=1 이면 서버를 --msgpack으로 띄워 길이 접두 MessagePack 프레임으로 테스트
+_USE_MSGPACK = os.environ.get("MCP_TEST_MSGPACK", "") not in ("", "0")
+
+# write_file_stream으로 보낼 때의 청크 크기 (글자 수)
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+# 파라미터가 없는 요청의 params (읽기 전용으로만 사용) / JSON (매번 직렬화하지 않음)
+_EMPTY_PARAMS: Dict[str, Any] = {}
+_EMPTY_PARAMS_JSON = b"{}"
+
+# MCP_TEST_INPROC=1 이면 서버 프로세스 없이 같은 프로세스에서 dispatch를 직접 호출
+_IN_PROC = os.environ.get("MCP_TEST_INPROC", "") not in ("", "0")
+
+# MCP_TEST_VERBOSE=1 이면 응답 전체를 보기 좋게 출력
+_VERBOSE = os.environ.get("MCP_TEST_VERBOSE", "") not in ("", "0")
+
+def tool_result(response: dict) -> dict:
+    """tools/call 응답의 text 필드(JSON 문자열)를 도구 결과 dict로 변환"""
+    return orjson.loads(response["result"]["content"][0]["text"])
+
+def expect(condition: bool, message: str):
+    """조건이 거짓이면 테스트 실패"""
+    if not condition:
+        raise AssertionError(message)
+
+# 테스트 단계 공통 클래스 (전송 방식은 하위 클래스의 send_request가 담당)
+class _MCPTestSteps(ABC):
+    def __init__(self, verbose: bool = _VERBOSE):
+        self.verbose = verbose
         self.request_id = 1
     
-    async def send_request(self, method: str, params: dict = None) -> dict:
-        """MCP 요청 전송"""
-        request = {
-            "jsonrpc": "2.0",
-            "id": str(self.request_id),
-            "method": method,
-            "params": params or {}
-        }
-        
-        # 서버에 요청 전송
-        request_json = json.dumps(request) + "\n"
-        self.server_process.stdin.write(request_json)
-        self.server_process.stdin.flush()
-        
-        # 응답 읽기
-        response_line = self.server_process.stdout.readline().strip()
-        response = json.loads(response_line)
-        
-        self.request_id += 1
-        return response
+    @abstractmethod
+    async def send_request(self, method: str, params: dict = None,
+                           on_notification: Callable[[dict], None] = None) -> dict:
+        """MCP 요청 전송 (하위 클래스에서 구현)"""
+    
+    async def close(self):
+        """클라이언트 정리 (정리할 것이 없으면 아무것도 안 함)"""
+    
+    def _print_response(self, label: str, response: dict):
+        """응답 출력 (verbose일 때만 전체 응답을 직렬화)"""
+        if self.verbose:
+            print(f"✅ {label} response: {orjson.dumps(response, option=orjson.OPT_INDENT_2).decode()}")
+        else:
+            print(f"✅ {label} response received")
     
     async def test_initialize(self):
         """초기화 테스트"""
         print("🔧 Testing MCP initialization...")
         response = await self.send_request("initialize")
-        print(f"✅ Initialize response: {json.dumps(response, indent=2, ensure_ascii=False)}")
+        self._print_response("Initialize", response)
         return response
     
     async def test_list_tools(self):
         """도구 목록 테스트"""
         print("\n📋 Testing tools list...")
         response = await self.send_request("tools/list")
-        print(f"✅ Tools list response: {json.dumps(response, indent=2, ensure_ascii=False)}")
+        self._print_response("Tools list", response)
         return response
     
     async def test_write_file(self, filepath: str, content: str):
@@ -59,19 +91,20 @@ class MCPTestClient:
                 "content": content
             }
         })
-        print(f"✅ Write file response: {json.dumps(response, indent=2, ensure_ascii=False)}")
+        self._print_response("Write file", response)
         return response
     
-    async def test_read_file(self, filepath: str):
-        """파일 읽기 테스트"""
-        print(f"\n📖 Testing file read: {filepath}")
+    async def test_read_file(self, filepath: str, max_size: int = None):
+        """파일 읽기 테스트 (max_size를 주면 잘라 읽기)"""
+        print(f"\n📖 Testing file read: {filepath}" + (f" (max_size={max_size})" if max_size is not None else ""))
+        arguments = {"filepath": filepath}
+        if max_size is not None:
+            arguments["max_size"] = max_size
         response = await self.send_request("tools/call", {
             "name": "read_file",
-            "arguments": {
-                "filepath": filepath
-            }
+            "arguments": arguments
         })
-        print(f"✅ Read file response: {json.dumps(response, indent=2, ensure_ascii=False)}")
+        self._print_response("Read file", response)
         return response
     
     async def test_append_file(self, filepath: str, content: str):
@@ -84,7 +117,7 @@ class MCPTestClient:
                 "content": content
             }
         })
-        print(f"✅ Append file response: {json.dumps(response, indent=2, ensure_ascii=False)}")
+        self._print_response("Append file", response)
         return response
     
     async def test_list_files(self, dirpath: str):
@@ -96,7 +129,7 @@ class MCPTestClient:
                 "dirpath": dirpath
             }
         })
-        print(f"✅ List files response: {json.dumps(response, indent=2, ensure_ascii=False)}")
+        self._print_response("List files", response)
         return response
     
     async def test_create_directory(self, dirpath: str):
@@ -108,7 +141,7 @@ class MCPTestClient:
                 "dirpath": dirpath
             }
         })
-        print(f"✅ Create directory response: {json.dumps(response, indent=2, ensure_ascii=False)}")
+        self._print_response("Create directory", response)
         return response
     
     async def test_update_file(self, filepath: str, find: str, replace: str):
@@ -122,7 +155,7 @@ class MCPTestClient:
                 "replace": replace
             }
         })
-        print(f"✅ Update file response: {json.dumps(response, indent=2, ensure_ascii=False)}")
+        self._print_response("Update file", response)
         return response
     
     async def test_delete_file(self, filepath: str):
@@ -134,71 +167,308 @@ class MCPTestClient:
                 "filepath": filepath
             }
         })
-        print(f"✅ Delete file response: {json.dumps(response, indent=2, ensure_ascii=False)}")
+        self._print_response("Delete file", response)
         return response
-
-async def run_comprehensive_test():
-    """종합 테스트 실행"""
-    print("🚀 Starting FastAPI MCP Server Test")
-    print("=" * 50)
     
-    # MCP 서버 프로세스 시작
-    import subprocess
-    server_process = subprocess.Popen(
-        [sys.executable, "mcp_server.py"],
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        bufsize=1
-    )
+    async def test_write_file_stream(self, filepath: str, content: str, chunk_size: int = _STREAM_CHUNK_SIZE):
+        """스트리밍 파일 쓰기 테스트 (청크를 순서대로 전송)"""
+        print(f"\n📤 Testing streamed file write: {filepath}")
+        chunks = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)] or [""]
+        for seq, chunk in enumerate(chunks):
+            response = await self.send_request("tools/call", {
+                "name": "write_file_stream",
+                "arguments": {
+                    "filepath": filepath,
+                    "chunk": chunk,
+                    "seq": seq
+                }
+            })
+        self._print_response("Write file stream", response)
+        print(f"   Sent {len(content)} characters in {len(chunks)} chunks")
+        return response
     
-    try:
-        # 테스트 클라이언트 생성
-        client = MCPTestClient(server_process)
-        
-        # 1. 초기화 테스트
-        await client.test_initialize()
-        
-        # 2. 도구 목록 테스트
-        await client.test_list_tools()
-        
-        # 3. 디렉토리 생성 테스트
-        test_dir = "test_files"
-        await client.test_create_directory(test_dir)
+    async def test_read_file_stream(self, filepath: str) -> str:
+        """스트리밍 파일 읽기 테스트 (청크 알림을 모아 내용을 복원)"""
+        print(f"\n📥 Testing streamed file read: {filepath}")
+        chunks = []
         
-        # 4. 파일 쓰기 테스트
-        test_file = f"{test_dir}/test.txt"
-        test_content = "안녕하세요! 이것은 테스트 파일입니다.\nHello! This is a test file."
-        await client.test_write_file(test_file, test_content)
+        def on_chunk(params: dict):
+            if not params.get("eof"):
+                chunks.append(params["chunk"])
         
-        # 5. 파일 읽기 테스트
-        await client.test_read_file(test_file)
-        
-        # 6. 파일 추가 테스트
-        append_content = "\n이것은 추가된 내용입니다.\nThis is appended content."
-        await client.test_append_file(test_file, append_content)
-        
-        # 7. 수정된 파일 읽기 테스트
-        await client.test_read_file(test_file)
-        
-        # 8. 파일 수정 테스트
-        await client.test_update_file(test_file, "테스트", "TEST")
-        
-        # 9. 수정된 파일 읽기 테스트
-        await client.test_read_file(test_file)
-        
-        # 10. 디렉토리 조회 테스트
-        await client.test_list_files(test_dir)
+        response = await self.send_request("tools/call", {
+            "name": "read_file_stream",
+            "arguments": {
+                "filepath": filepath
+            }
+        }, on_notification=on_chunk)
+        self._print_response("Read file stream", response)
+        content = "".join(chunks)
+        print(f"   Received {len(content)} characters in {len(chunks)} chunks")
+        return content
+
+# 서버 프로세스와 stdio로 통신하는 테스트 클라이언트
+class MCPTestClient(_MCPTestSteps):
+    def __init__(self, server_process: asyncio.subprocess.Process, use_msgpack: bool = False,
+                 verbose: bool = _VERBOSE):
+        super().__init__(verbose)
+        self.server_process = server_process
+        self.use_msgpack = use_msgpack
+        # 요청 id -> 응답을 기다리는 Future (응답 순서와 무관하게 id로 매칭)
+        self._pending: Dict[str, asyncio.Future] = {}
+        # 요청 id -> 그 요청에 딸린 알림(notifications/file_chunk 등)을 받을 콜백
+        self._notification_handlers: Dict[str, Callable[[dict], None]] = {}
+        self._reader_task = asyncio.get_running_loop().create_task(self._reader_loop())
+    
+    @classmethod
+    @asynccontextmanager
+    async def spawn(cls, use_msgpack: bool = False, verbose: bool = _VERBOSE):
+        """MCP 서버 프로세스를 띄우고 클라이언트를 반환 (종료 시 프로세스 정리)"""
+        server_process = await asyncio.create_subprocess_exec(
+            sys.executable, "mcp_server.py", *(["--msgpack"] if use_msgpack else []),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=_STREAM_LIMIT
+        )
+        client = cls(server_process, use_msgpack=use_msgpack, verbose=verbose)
+        try:
+            # tools/list에 응답할 때까지 대기 (서버가 먼저 종료되면 바로 실패)
+            await wait_process_ready(
+                server_process,
+                lambda: asyncio.wait_for(client.send_request("tools/list"), _PING_TIMEOUT)
+            )
+            yield client
+        finally:
+            # 서버 프로세스 종료
+            if server_process.returncode is None:
+                server_process.terminate()
+            await server_process.wait()
+            await client.close()
+    
+    def _encode(self, request_id: int, method: str, params: dict = None) -> bytes:
+        """요청을 전송 형식(JSON 한 줄 또는 MessagePack 프레임)으로 직렬화"""
+        if self.use_msgpack:
+            body = msgspec.msgpack.encode({
+                "jsonrpc": "2.0",
+                "id": str(request_id),
+                "method": method,
+                "params": params if params is not None else _EMPTY_PARAMS
+            })
+            return len(body).to_bytes(4, "big") + body
+        # 고정된 envelope는 직접 조립하고 method/params만 직렬화
+        return b'{"jsonrpc":"2.0","id":"%d","method":%b,"params":%b}\n' % (
+            request_id,
+            orjson.dumps(method),
+            orjson.dumps(params) if params else _EMPTY_PARAMS_JSON
+        )
+    
+    async def _read_message(self):
+        """응답 하나를 읽어 dict로 반환 (EOF면 None)"""
+        stdout = self.server_process.stdout
+        if self.use_msgpack:
+            try:
+                header = await stdout.readexactly(4)
+                body = await stdout.readexactly(int.from_bytes(header, "big"))
+            except asyncio.IncompleteReadError:
+                return None
+            return msgspec.msgpack.decode(body)
+        response_line = await stdout.readline()
+        if not response_line:
+            return None
+        return orjson.loads(response_line)
+    
+    async def _reader_loop(self):
+        """서버 응답을 계속 읽어서 id가 같은 요청의 Future에 전달"""
+        try:
+            while True:
+                response = await self._read_message()
+                if response is None:
+                    break
+                if "id" not in response:
+                    # 알림: params.requestId로 요청을 찾아 콜백 호출
+                    params = response.get("params") or _EMPTY_PARAMS
+                    handler = self._notification_handlers.get(str(params.get("requestId")))
+                    if handler is not None:
+                        handler(params)
+                    continue
+                self._notification_handlers.pop(str(response.get("id")), None)
+                future = self._pending.pop(str(response.get("id")), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            # 서버가 종료되면 남은 요청은 모두 실패 처리
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("MCP server closed stdout"))
+            self._pending.clear()
+    
+    async def send_request(self, method: str, params: dict = None,
+                           on_notification: Callable[[dict], None] = None) -> dict:
+        """MCP 요청 전송 (응답을 기다리는 동안 다른 요청도 보낼 수 있음)"""
+        request_id = self.request_id
+        self.request_id += 1
         
-        # 11. 파일 삭제 테스트
-        await client.test_delete_file(test_file)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[str(request_id)] = future
+        if on_notification is not None:
+            self._notification_handlers[str(request_id)] = on_notification
         
-        # 12. 삭제 후 디렉토리 조회 테스트
-        await client.test_list_files(test_dir)
+        # 서버에 요청 전송 (바이트 그대로 씀)
+        self.server_process.stdin.write(self._encode(request_id, method, params))
+        await self.server_process.stdin.drain()
         
-        print("\n" + "=" * 50)
-        print("✅ All tests completed successfully!")
+        # 응답은 _reader_loop가 전달
+        return await future
+    
+    async def close(self):
+        """응답 읽기 태스크 정리"""
+        self._reader_task.cancel()
+        await asyncio.gather(self._reader_task, return_exceptions=True)
+
+# 같은 프로세스에서 서버를 직접 호출하는 테스트 클라이언트
+class MCPInProcClient(_MCPTestSteps):
+    def __init__(self, stdio_server, verbose: bool = _VERBOSE):
+        super().__init__(verbose)
+        self.stdio_server = stdio_server
+    
+    @classmethod
+    @asynccontextmanager
+    async def spawn(cls, verbose: bool = _VERBOSE):
+        """같은 프로세스에 MCP 서버를 만들고 클라이언트를 반환"""
+        # 서버 모듈(FastAPI 등)은 in-process 모드에서만 불러옴
+        from mcp_server import MCPStdioServer
+        yield cls(MCPStdioServer(), verbose=verbose)
+    
+    async def send_request(self, method: str, params: dict = None,
+                           on_notification: Callable[[dict], None] = None) -> dict:
+        """MCP 요청을 stdio 없이 서버의 dispatch로 바로 전달"""
+        request_id = str(self.request_id)
+        self.request_id += 1
+        return await self.stdio_server.dispatch({
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": method,
+            "params": params if params is not None else _EMPTY_PARAMS
+        }, on_notification)
+
+async def run_comprehensive_test():
+    """종합 테스트 실행"""
+    print("🚀 Starting FastAPI MCP Server Test")
+    print("=" * 50)
+    
+    try:
+        # MCP 서버 프로세스 시작 + 테스트 클라이언트 생성 (MCP_TEST_INPROC이면 같은 프로세스에서 실행)
+        if _IN_PROC:
+            spawn = MCPInProcClient.spawn()
+        else:
+            spawn = MCPTestClient.spawn(use_msgpack=_USE_MSGPACK)
+        async with spawn as client:
+            # 1~3. 초기화 / 도구 목록 / 디렉토리 생성 테스트 (서로 독립적이므로 한 번에 전송)
+            test_dir = "test_files"
+            await asyncio.gather(
+                client.test_initialize(),
+                client.test_list_tools(),
+                client.test_create_directory(test_dir)
+            )
+            
+            # 4. 파일 쓰기 테스트
+            test_file = f"{test_dir}/test.txt"
+            test_content = "안녕하세요! 이것은 테스트 파일입니다.\nHello! This is a test file."
+            await client.test_write_file(test_file, test_content)
+            
+            # 5. 파일 읽기 테스트: 캐시가 비어 있을 때 잘라 읽기, 전체 읽기(캐시 채움), 캐시에서 잘라 읽기
+            result = tool_result(await client.test_read_file(test_file, max_size=5))
+            expect(result["data"]["content"] == test_content[:5] and result["data"]["size"] == 5
+                   and result["data"]["truncated"] is True, "max_size=5 did not return 5 truncated chars")
+            result = tool_result(await client.test_read_file(test_file))
+            expect(result["data"]["content"] == test_content, "Read content does not match the written content")
+            expect(result["data"]["truncated"] is False, "Full read reported truncated")
+            result = tool_result(await client.test_read_file(test_file, max_size=5))
+            expect(result["data"]["content"] == test_content[:5] and result["data"]["truncated"] is True,
+                   "Cached max_size=5 read did not return 5 truncated chars")
+            result = tool_result(await client.test_read_file(test_file, max_size=len(test_content) + 100))
+            expect(result["data"]["content"] == test_content and result["data"]["truncated"] is False,
+                   "max_size larger than the file reported truncated")
+            
+            # 6. 파일 추가 테스트
+            append_content = "\n이것은 추가된 내용입니다.\nThis is appended content."
+            await client.test_append_file(test_file, append_content)
+            
+            # 7. 수정된 파일 읽기 테스트 (캐시된 이전 내용이 아니라 추가된 내용이 보여야 함)
+            expected_content = test_content + append_content
+            result = tool_result(await client.test_read_file(test_file))
+            expect(result["data"]["content"] == expected_content, "Read after append returned stale content")
+            
+            # 8. 파일 수정 테스트
+            await client.test_update_file(test_file, "테스트", "TEST")
+            
+            # 9. 수정된 파일 읽기 테스트 (치환 결과가 보여야 함)
+            expected_content = expected_content.replace("테스트", "TEST")
+            result = tool_result(await client.test_read_file(test_file))
+            expect(result["data"]["content"] == expected_content, "Read after update returned stale content")
+            
+            # 9-1. 변경이 없는 수정 요청: find == replace, 빈 find
+            result = tool_result(await client.test_update_file(test_file, "TEST", "TEST"))
+            expect(result["message"].startswith("No changes made: find and replace are identical"),
+                   "find == replace did not report 'find and replace are identical'")
+            result = tool_result(await client.test_update_file(test_file, "", "X"))
+            expect(result["success"] is False and "find must not be empty" in result["message"],
+                   "Empty find was not rejected")
+            result = tool_result(await client.test_read_file(test_file))
+            expect(result["data"]["content"] == expected_content, "No-op update changed the file")
+            
+            # 10. 디렉토리 조회 테스트
+            await client.test_list_files(test_dir)
+            
+            # 11. 파일 삭제 테스트
+            await client.test_delete_file(test_file)
+            
+            # 12. 삭제 후 디렉토리 조회 테스트
+            await client.test_list_files(test_dir)
+            
+            # 13. 없는 경로 캐시 무효화 테스트: 실패한 조회 뒤 생성하면 바로 조회되어야 함
+            result = tool_result(await client.test_read_file(test_file))
+            expect(result["success"] is False, "Read of a deleted file succeeded")
+            await client.test_write_file(test_file, test_content)
+            result = tool_result(await client.test_read_file(test_file))
+            expect(result["success"] is True and result["data"]["content"] == test_content,
+                   "Read after write_file still reported the file as missing")
+            await client.test_delete_file(test_file)
+            
+            # 디렉토리 삭제 도구가 없으므로 서버와 같은 작업 디렉토리에서 직접 정리
+            sub_dir = f"{test_dir}/sub_dir"
+            if os.path.isdir(sub_dir):
+                os.rmdir(sub_dir)
+            result = tool_result(await client.test_list_files(sub_dir))
+            expect(result["success"] is False, "List of a missing directory succeeded")
+            await client.test_create_directory(sub_dir)
+            result = tool_result(await client.test_list_files(sub_dir))
+            expect(result["success"] is True, "List after create_directory still reported the directory as missing")
+            os.rmdir(sub_dir)
+            
+            # 14. 스트리밍 쓰기/읽기 테스트 (여러 청크로 나뉘는 크기)
+            stream_file = f"{test_dir}/stream_test.txt"
+            stream_content = "스트리밍 테스트 줄입니다. Streaming test line.\n" * 5000
+            await client.test_write_file_stream(stream_file, stream_content)
+            streamed_content = await client.test_read_file_stream(stream_file)
+            if streamed_content != stream_content:
+                raise AssertionError("Streamed content does not match the written content")
+            
+            # 빠진 seq의 청크는 거부되고 파일은 그대로여야 함
+            response = await client.send_request("tools/call", {
+                "name": "write_file_stream",
+                "arguments": {"filepath": stream_file, "chunk": "gap", "seq": 1000}
+            })
+            result = tool_result(response)
+            expect(result["success"] is False and "Out-of-order chunk" in result["message"],
+                   "Chunk with a gap in seq was not rejected")
+            
+            # 15. 스트리밍 테스트 파일 삭제
+            await client.test_delete_file(stream_file)
+            
+            print("\n" + "=" * 50)
+            print("✅ All tests completed successfully!")
         
     except Exception as e:
         print(f"\n❌ Test failed: {e}")
@@ -206,10 +476,13 @@ async def run_comprehensive_test():
         traceback.print_exc()
     
     finally:
-        # 서버 프로세스 종료
-        server_process.terminate()
-        server_process.wait()
         print("🔚 MCP server process terminated")
 
 if __name__ == "__main__":
-    asyncio.run(run_comprehensive_test()) 
\ No newline at end of file
+    # 서버와 같은 uvloop 이벤트 루프로 실행 (미설치 시 기본 asyncio 루프)
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(run_comprehensive_test())
+    else:
+        uvloop.run(run_comprehensive_test()) 
\ No newline at end of file
@@ -5,49 +5,92 @@ FastAPI 웹 서버 테스트 스크립트
 
 import asyncio
 import aiohttp
-import json
+import codecs
+import orjson
+import os
 from pathlib import Path
 
+from test_helpers import tcp_probe, wait_process_ready
+
+# 테스트 요청 전체에 적용할 타임아웃 (초)
+_REQUEST_TIMEOUT = 30
+
+# 웹 API 요청의 고정 부분 (id가 항상 같으므로 method 앞까지 미리 만들어 둠)
+_ENVELOPE_PREFIX = b'{"jsonrpc":"2.0","id":"test-1","method":'
+
+# 스트리밍 쓰기/읽기 청크 크기 (쓰기는 글자 수, 읽기는 바이트 수)
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+# 파라미터가 없는 요청의 params JSON (매번 직렬화하지 않음)
+_EMPTY_PARAMS_JSON = b"{}"
+
+# MCP_TEST_VERBOSE=1 이면 응답 전체를 보기 좋게 출력
+_VERBOSE = os.environ.get("MCP_TEST_VERBOSE", "") not in ("", "0")
+
 class WebAPITestClient:
-    def __init__(self, base_url: str = "http://127.0.0.1:8000"):
+    def __init__(self, base_url: str = "http://127.0.0.1:8000", verbose: bool = _VERBOSE):
         self.base_url = base_url
+        self.verbose = verbose
         self.session = None
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        # 연결 하나를 keep-alive로 재사용 (요청마다 새로 연결하지 않음)
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=100,
+            keepalive_timeout=75,
+            ttl_dns_cache=300
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=_REQUEST_TIMEOUT)
+        )
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        # 세션이 커넥터를 소유하므로 세션을 닫으면 커넥터도 함께 닫힘
         if self.session:
             await self.session.close()
     
+    @staticmethod
+    def _encode_request(method: str, params: dict = None) -> bytes:
+        """고정 envelope에 method/params만 직렬화해 붙임"""
+        return b"%b%b,\"params\":%b}" % (
+            _ENVELOPE_PREFIX,
+            orjson.dumps(method),
+            orjson.dumps(params) if params else _EMPTY_PARAMS_JSON
+        )
+    
     async def send_mcp_request(self, method: str, params: dict = None) -> dict:
         """MCP 요청을 웹 API로 전송"""
-        request_data = {
-            "jsonrpc": "2.0",
-            "id": "test-1",
-            "method": method,
-            "params": params or {}
-        }
+        request_data = self._encode_request(method, params)
         
         async with self.session.post(
             f"{self.base_url}/mcp/{method.replace('/', '/')}",
-            json=request_data
+            data=request_data,
+            headers={"content-type": "application/json"}
         ) as response:
-            return await response.json()
+            return orjson.loads(await response.read())
+    
+    def _print_response(self, label: str, response: dict):
+        """응답 출력 (verbose일 때만 전체 응답을 직렬화)"""
+        if self.verbose:
+            print(f"✅ {label} response: {orjson.dumps(response, option=orjson.OPT_INDENT_2).decode()}")
+        else:
+            print(f"✅ {label} response received")
     
     async def test_initialize(self):
         """초기화 테스트"""
         print("🔧 Testing MCP initialization...")
         response = await self.send_mcp_request("initialize")
-        print(f"✅ Initialize response: {json.dumps(response, indent=2, ensure_ascii=False)}")
+        self._print_response("Initialize", response)
         return response
     
     async def test_list_tools(self):
         """도구 목록 테스트"""
         print("\n📋 Testing tools list...")
         response = await self.send_mcp_request("tools/list")
-        print(f"✅ Tools list response: {json.dumps(response, indent=2, ensure_ascii=False)}")
+        self._print_response("Tools list", response)
         return response
     
     async def test_write_file(self, filepath: str, content: str):
@@ -60,7 +103,7 @@ class WebAPITestClient:
                 "content": content
             }
         })
-        print(f"✅ Write file response: {json.dumps(response, indent=2, ensure_ascii=False)}")
+        self._print_response("Write file", response)
         return response
     
     async def test_read_file(self, filepath: str):
@@ -72,7 +115,7 @@ class WebAPITestClient:
                 "filepath": filepath
             }
         })
-        print(f"✅ Read file response: {json.dumps(response, indent=2, ensure_ascii=False)}")
+        self._print_response("Read file", response)
         return response
     
     async def test_append_file(self, filepath: str, content: str):
@@ -85,7 +128,7 @@ class WebAPITestClient:
                 "content": content
             }
         })
-        print(f"✅ Append file response: {json.dumps(response, indent=2, ensure_ascii=False)}")
+        self._print_response("Append file", response)
         return response
     
     async def test_list_files(self, dirpath: str):
@@ -97,7 +140,7 @@ class WebAPITestClient:
                 "dirpath": dirpath
             }
         })
-        print(f"✅ List files response: {json.dumps(response, indent=2, ensure_ascii=False)}")
+        self._print_response("List files", response)
         return response
     
     async def test_create_directory(self, dirpath: str):
@@ -109,7 +152,7 @@ class WebAPITestClient:
                 "dirpath": dirpath
             }
         })
-        print(f"✅ Create directory response: {json.dumps(response, indent=2, ensure_ascii=False)}")
+        self._print_response("Create directory", response)
         return response
     
     async def test_update_file(self, filepath: str, find: str, replace: str):
@@ -123,7 +166,7 @@ class WebAPITestClient:
                 "replace": replace
             }
         })
-        print(f"✅ Update file response: {json.dumps(response, indent=2, ensure_ascii=False)}")
+        self._print_response("Update file", response)
         return response
     
     async def test_delete_file(self, filepath: str):
@@ -135,8 +178,58 @@ class WebAPITestClient:
                 "filepath": filepath
             }
         })
-        print(f"✅ Delete file response: {json.dumps(response, indent=2, ensure_ascii=False)}")
+        self._print_response("Delete file", response)
         return response
+    
+    async def test_write_file_stream(self, filepath: str, content: str, chunk_size: int = _STREAM_CHUNK_SIZE):
+        """스트리밍 파일 쓰기 테스트 (청크를 순서대로 전송)"""
+        print(f"\n📤 Testing streamed file write: {filepath}")
+        chunks = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)] or [""]
+        for seq, chunk in enumerate(chunks):
+            response = await self.send_mcp_request("tools/call", {
+                "name": "write_file_stream",
+                "arguments": {
+                    "filepath": filepath,
+                    "chunk": chunk,
+                    "seq": seq
+                }
+            })
+        self._print_response("Write file stream", response)
+        print(f"   Sent {len(content)} characters in {len(chunks)} chunks")
+        return response
+    
+    async def test_read_file_stream(self, filepath: str) -> str:
+        """스트리밍 파일 읽기 테스트 (/mcp/tools/stream 응답 본문을 청크 단위로 읽어 복원)"""
+        print(f"\n📥 Testing streamed file read: {filepath}")
+        request_data = self._encode_request("tools/call", {
+            "name": "read_file_stream",
+            "arguments": {
+                "filepath": filepath
+            }
+        })
+        
+        async with self.session.post(
+            f"{self.base_url}/mcp/tools/stream",
+            data=request_data,
+            headers={"content-type": "application/json"}
+        ) as response:
+            if response.content_type == "application/json":
+                # 스트리밍 전에 실패하면 JSON-RPC 오류 응답이 옴
+                error_response = orjson.loads(await response.read())
+                self._print_response("Read file stream", error_response)
+                raise RuntimeError(error_response["error"]["message"])
+            
+            # 청크 경계에서 잘린 UTF-8 문자는 다음 청크와 합쳐서 디코딩
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            parts = []
+            async for chunk in response.content.iter_chunked(_STREAM_CHUNK_SIZE):
+                parts.append(decoder.decode(chunk))
+            parts.append(decoder.decode(b"", final=True))
+        
+        content = "".join(parts)
+        print("✅ Read file stream response received")
+        print(f"   Received {len(content)} characters")
+        return content
 
 async def run_web_api_test():
     """웹 API 종합 테스트 실행"""
@@ -146,7 +239,6 @@ async def run_web_api_test():
     # 웹 서버 시작
     import subprocess
     import sys
-    import time
     
     server_process = subprocess.Popen(
         [sys.executable, "mcp_server.py", "--web"],
@@ -154,21 +246,19 @@ async def run_web_api_test():
         stderr=subprocess.PIPE
     )
     
-    # 서버 시작 대기
-    print("⏳ Waiting for server to start...")
-    time.sleep(3)
-    
     try:
+        # 서버 시작 대기
+        print("⏳ Waiting for server to start...")
+        await wait_process_ready(server_process, tcp_probe("127.0.0.1", 8000))
+        
         async with WebAPITestClient() as client:
-            # 1. 초기화 테스트
-            await client.test_initialize()
-            
-            # 2. 도구 목록 테스트
-            await client.test_list_tools()
-            
-            # 3. 디렉토리 생성 테스트
+            # 1~3. 초기화 / 도구 목록 / 디렉토리 생성 테스트 (서로 독립적이므로 동시에 요청)
             test_dir = "web_test_files"
-            await client.test_create_directory(test_dir)
+            await asyncio.gather(
+                client.test_initialize(),
+                client.test_list_tools(),
+                client.test_create_directory(test_dir)
+            )
             
             # 4. 파일 쓰기 테스트
             test_file = f"{test_dir}/web_test.txt"
@@ -188,11 +278,11 @@ async def run_web_api_test():
             # 8. 파일 수정 테스트
             await client.test_update_file(test_file, "웹 API", "Web API")
             
-            # 9. 수정된 파일 읽기 테스트
-            await client.test_read_file(test_file)
-            
-            # 10. 디렉토리 조회 테스트
-            await client.test_list_files(test_dir)
+            # 9~10. 수정된 파일 읽기 / 디렉토리 조회 테스트 (둘 다 읽기만 하므로 동시에 요청)
+            await asyncio.gather(
+                client.test_read_file(test_file),
+                client.test_list_files(test_dir)
+            )
             
             # 11. 파일 삭제 테스트
             await client.test_delete_file(test_file)
@@ -200,6 +290,17 @@ async def run_web_api_test():
             # 12. 삭제 후 디렉토리 조회 테스트
             await client.test_list_files(test_dir)
             
+            # 13. 스트리밍 쓰기/읽기 테스트 (여러 청크로 나뉘는 크기)
+            stream_file = f"{test_dir}/web_stream_test.txt"
+            stream_content = "웹 API 스트리밍 테스트 줄입니다. Web API streaming test line.\n" * 5000
+            await client.test_write_file_stream(stream_file, stream_content)
+            streamed_content = await client.test_read_file_stream(stream_file)
+            if streamed_content != stream_content:
+                raise AssertionError("Streamed content does not match the written content")
+            
+            # 14. 스트리밍 테스트 파일 삭제
+            await client.test_delete_file(stream_file)
+            
             print("\n" + "=" * 50)
             print("✅ All web API tests completed successfully!")
     
@@ -215,4 +316,10 @@ async def run_web_api_test():
         print("🔚 Web server process terminated")
 
 if __name__ == "__main__":
-    asyncio.run(run_web_api_test()) 
\ No newline at end of file
+    # 서버와 같은 uvloop 이벤트 루프로 실행 (미설치 시 기본 asyncio 루프)
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(run_web_api_test())
+    else:
+        uvloop.run(run_web_api_test()) 
\ No newline at end of file